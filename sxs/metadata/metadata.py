@@ -309,7 +309,7 @@ class Metadata(collections.OrderedDict):
             args = list(args)
             if isinstance(args[0], collections.abc.Mapping):
                 mapping = args[0]
-                args[0] = collections.OrderedDict([(_valid_identifier(key), mapping[key]) for key in mapping])
+                args[0] = {_valid_identifier(key): mapping[key] for key in mapping}
             else:
                 iterable = args[0]
                 args[0] = [(_valid_identifier(k), v) for k, v in iterable]
@@ -611,9 +611,9 @@ class Metadata(collections.OrderedDict):
 
     def update(self, mapping_or_iterable=None, **kwargs):
         if isinstance(mapping_or_iterable, collections.abc.Mapping):
-            mapping_or_iterable = collections.OrderedDict(
-                [(_valid_identifier(key), mapping_or_iterable[key]) for key in mapping_or_iterable]
-            )
+            mapping_or_iterable = {
+                _valid_identifier(key): mapping_or_iterable[key] for key in mapping_or_iterable
+            }
         elif isinstance(mapping_or_iterable, collections.abc.Iterable):
             mapping_or_iterable = [(_valid_identifier(k), v) for k, v in mapping_or_iterable]
         return super(Metadata, self).update(mapping_or_iterable)
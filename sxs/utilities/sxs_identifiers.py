@@ -29,7 +29,6 @@ def sxs_id(s, default="", include_version=False):
 
     """
     import os.path
-    import re
     try:
         s = s["title"]
     except (TypeError, KeyError):
@@ -47,7 +46,7 @@ def sxs_id(s, default="", include_version=False):
             return default
     except TypeError:
         pass
-    m = re.search(sxs_identifier_regex, s)
+    m = sxs_identifier_re.search(s)
     if m:
         if include_version:
             return m["sxs_identifier"] + (f"v{m['version']}" if m["version"] else "")
@@ -67,9 +66,7 @@ def simulation_title(sxs_id):
         Binary neutron-star simulation SXS:NSNS:0001
 
     """
-    import re
-    sxs_system_re = re.compile(sxs_identifier_regex)
-    m = sxs_system_re.search(sxs_id)
+    m = sxs_identifier_re.search(sxs_id)
     if not m:
         raise ValueError(f"No SXS identifier found in '{sxs_id}'")
     sxs_identifier = m["sxs_identifier"]
@@ -96,8 +93,7 @@ def lev_number(s):
     only the first is returned.
 
     """
-    import re
-    m = re.search(lev_regex, s)
+    m = lev_re.search(s)
     if m:
         return int(m["lev"])
     else:
@@ -4,11 +4,72 @@ import quaternionic
 
 from scipy.integrate import trapezoid
 
+import os
 import multiprocessing as mp
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, lru_cache
 
+from .. import jit
 
-def align1d(wa, wb, t1, t2, n_brute_force=None):
+
+def _modes_slice(ell_min, ell_max):
+    """Slice selecting the modes with 2 ≤ ℓ ≤ `ell_max` in data starting at `ell_min`
+
+    This is equivalent to `slice(w.index(2, -2), w.index(ell_max+1, -(ell_max+1)))`,
+    using the closed form of the index of mode (ℓ, m), which is ℓ² + ℓ + m - ell_min².
+
+    """
+    return slice(4 - ell_min**2, (ell_max + 1) ** 2 - ell_min**2)
+
+
+@lru_cache()
+def _m_values(ell_max):
+    """Read-only array of m values for each mode with 2 ≤ ℓ ≤ `ell_max`"""
+    m = np.array([M for L in range(2, ell_max + 1) for M in range(-L, L + 1)])
+    m.flags.writeable = False
+    return m
+
+
+def _trapezoid_weights(t):
+    """Weights `w` such that `w @ y` equals `trapezoid(y, t)` along the first axis of `y`"""
+    w = np.zeros_like(t)
+    if t.size > 1:
+        Δt = np.diff(t)
+        w[:-1] += Δt / 2
+        w[1:] += Δt / 2
+    return w
+
+
+@jit
+def _cost1d_integral(δt, t_reference, norm_a, breakpoints, coefficients):
+    """Helper function for `align1d`
+
+    Computes ∫ [‖a(t)‖ - ‖b(t+δt)‖]² dt using the trapezoidal rule, in a single pass
+    over the data.  Here, ‖b‖ is the cubic spline with the given `breakpoints` and
+    `coefficients`, which are the `x` and `c` attributes of a
+    `scipy.interpolate.CubicSpline`.  Like that object, this extrapolates using
+    the first or last polynomial piece.
+
+    """
+    n_intervals = breakpoints.size - 1
+    j = 0
+    diff = 0.0
+    previous = 0.0
+    for i_time in range(t_reference.size):
+        t = t_reference[i_time] + δt
+        # Since t_reference is sorted, we only ever need to move forward
+        while j < n_intervals - 1 and t >= breakpoints[j + 1]:
+            j += 1
+        x = t - breakpoints[j]
+        norm_b = ((coefficients[0, j] * x + coefficients[1, j]) * x + coefficients[2, j]) * x + coefficients[3, j]
+        current = (norm_a[i_time] - norm_b) ** 2
+        if i_time > 0:
+            diff += 0.5 * (t_reference[i_time] - t_reference[i_time - 1]) * (current + previous)
+        previous = current
+    return diff
+
+
+def align1d(wa, wb, t1, t2, n_brute_force=None, brute_force_window=None):
     """Align waveforms by shifting in time
 
     This function determines the optimal time offset to apply to `wb` by minimizing
@@ -58,6 +119,13 @@ def align1d(wa, wb, t1, t2, n_brute_force=None):
         for the initial guess.  By default, this is just the maximum number of
         time steps in the range (t1, t2) in the input waveforms.  If this is
         too small, an incorrect local minimum may be found.
+    brute_force_window : float, optional
+        If given, first search only for δt values in the range ±`brute_force_window`,
+        using the same spacing as the full brute-force search.  This is much faster
+        when the waveforms are already nearly aligned — for example, by aligning
+        the peaks as described above.  If the optimum found is at the edge of this
+        window, the full range is searched instead.  By default, the full range is
+        always searched.
 
     Notes
     -----
@@ -78,8 +146,7 @@ def align1d(wa, wb, t1, t2, n_brute_force=None):
 
     """
     from scipy.interpolate import CubicSpline
-    from scipy.integrate import trapezoid
-    from scipy.optimize import least_squares
+    from scipy.optimize import minimize_scalar
 
     # Check that (t1, t2) makes sense and is actually contained in both waveforms
     if t2 <= t1:
@@ -93,32 +160,126 @@ def align1d(wa, wb, t1, t2, n_brute_force=None):
     δt_lower = max(t1 - t2, t2 - wb.t[-1])
     δt_upper = min(t2 - t1, t1 - wb.t[0])
 
+    # Find the time steps in [t1,t2] in each waveform; the time arrays are sorted,
+    # so these are just contiguous slices
+    slice_a = slice(np.searchsorted(wa.t, t1, side="left"), np.searchsorted(wa.t, t2, side="right"))
+    slice_b = slice(np.searchsorted(wb.t, t1, side="left"), np.searchsorted(wb.t, t2, side="right"))
+
     # We'll start by brute forcing, sampling time offsets evenly at as many
     # points as there are time steps in (t1,t2) in the input waveforms
     if n_brute_force is None:
-        n_brute_force = max(sum((wa.t >= t1) & (wa.t <= t2)), sum((wb.t >= t1) & (wb.t <= t2)))
-    δt_brute_force = np.linspace(δt_lower, δt_upper, num=n_brute_force)
+        n_brute_force = max(slice_a.stop - slice_a.start, slice_b.stop - slice_b.start)
 
     # Times at which the differences will be evaluated
-    t_reference = wa.t[(wa.t >= t1) & (wa.t <= t2)]
+    t_reference = wa.t[slice_a]
 
     # Define the cost function
-    norm_a = wa.norm.ndarray[(wa.t >= t1) & (wa.t <= t2)]
-    norm_b = CubicSpline(wb.t, wb.norm.ndarray)
-    normalization = trapezoid((norm_a) ** 2, t_reference)
+    index_a = tuple(slice_a if axis == wa.time_axis else slice(None) for axis in range(wa.ndarray.ndim))
+    norm_a = np.linalg.norm(wa.ndarray[index_a], axis=wa.modes_axis)
+    norm_b_data = wb.norm.ndarray
+    norm_b = CubicSpline(wb.t, norm_b_data)
+    weights = _trapezoid_weights(t_reference)
+    normalization = norm_a**2 @ weights
 
     def cost(δt):
-        # Take the sqrt because least_squares squares the inputs...
-        return np.sqrt(trapezoid((norm_a - norm_b(t_reference + δt)) ** 2, t_reference) / normalization)
+        return _cost1d_integral(δt, t_reference, norm_a, norm_b.x, norm_b.c) / normalization
+
+    def optimize(δt_lower, δt_upper, n_brute_force):
+        δt_brute_force = np.linspace(δt_lower, δt_upper, num=n_brute_force)
+
+        # Optimize by brute force, evaluating the cost for many values of δt at once;
+        # we work in chunks to keep the memory footprint bounded.  The brute-force
+        # search only needs to find the right basin, so linear interpolation is
+        # accurate enough here; the spline is used for the refinement below.
+        cost_brute_force = np.empty(n_brute_force)
+        chunk_size = max(1, 2**22 // t_reference.size)
+        for i in range(0, n_brute_force, chunk_size):
+            δt_chunk = δt_brute_force[i : i + chunk_size]
+            norm_b_chunk = np.interp(t_reference[np.newaxis, :] + δt_chunk[:, np.newaxis], wb.t, norm_b_data)
+            cost_brute_force[i : i + chunk_size] = ((norm_a - norm_b_chunk) ** 2 @ weights) / normalization
+        i_δt = np.argmin(cost_brute_force)
+
+        # Optimize explicitly; this is a bounded scalar problem, so we use Brent's
+        # method between the brute-force samples neighboring the best one
+        bounds = (
+            δt_brute_force[i_δt - 1] if i_δt > 0 else δt_lower,
+            δt_brute_force[i_δt + 1] if i_δt < n_brute_force - 1 else δt_upper,
+        )
+        optimum = minimize_scalar(cost, bounds=bounds, method="bounded", options=dict(xatol=1e-10))
 
-    # Optimize by brute force
-    cost_brute_force = [cost(δt) for δt in δt_brute_force]
-    δt = δt_brute_force[np.argmin(cost_brute_force)]
+        return optimum.x
 
-    # Optimize explicitly
-    optimum = least_squares(cost, δt, bounds=(δt_lower, δt_upper))
+    if brute_force_window is not None:
+        # Search near δt=0 first, with the same spacing as the full search would use
+        window_lower = max(δt_lower, -abs(brute_force_window))
+        window_upper = min(δt_upper, abs(brute_force_window))
+        spacing = (δt_upper - δt_lower) / max(n_brute_force - 1, 1)
+        n_window = max(int(np.ceil((window_upper - window_lower) / spacing)) + 1, 2)
+        δt = optimize(window_lower, window_upper, n_window)
+
+        # Accept this unless it is pinned to an edge of the window that is not
+        # also an edge of the full range, which suggests the true optimum is
+        # outside of the window
+        hit_lower = window_lower > δt_lower and δt - window_lower < spacing
+        hit_upper = window_upper < δt_upper and window_upper - δt < spacing
+        if not (hit_lower or hit_upper):
+            return δt
 
-    return optimum.x[0]
+    return optimize(δt_lower, δt_upper, n_brute_force)
+
+
+@jit
+def _cost2d_integral(modes_A_at_δt, phase, modes_B, t_reference):
+    """Helper function for `_cost2d`
+
+    Computes ∫ Σₘ |A(t) phase - B(t)|² dt using the trapezoidal rule, in a single
+    pass over the data without any temporary arrays.
+
+    """
+    diff = 0.0
+    previous = 0.0
+    for i_time in range(t_reference.size):
+        current = 0.0
+        for i_mode in range(modes_B.shape[1]):
+            z = modes_A_at_δt[i_time, i_mode] * phase[i_mode] - modes_B[i_time, i_mode]
+            current += z.real * z.real + z.imag * z.imag
+        if i_time > 0:
+            diff += 0.5 * (t_reference[i_time] - t_reference[i_time - 1]) * (current + previous)
+        previous = current
+    return diff
+
+
+@jit
+def _cost2d_integral_gradient(modes_A_at_δt, modes_A_prime_at_δt, phase, m, modes_B, t_reference):
+    """Helper function for `_jacobian2d`
+
+    Computes the integral of `_cost2d_integral` along with its derivatives with
+    respect to δt and δϕ, using the trapezoidal rule in a single pass over the
+    data.
+
+    """
+    diff = 0.0
+    d_δt = 0.0
+    d_δϕ = 0.0
+    previous = np.zeros(3)
+    current = np.zeros(3)
+    for i_time in range(t_reference.size):
+        current[:] = 0.0
+        for i_mode in range(modes_B.shape[1]):
+            z = modes_A_at_δt[i_time, i_mode] * phase[i_mode] - modes_B[i_time, i_mode]
+            z_prime = modes_A_prime_at_δt[i_time, i_mode] * phase[i_mode]
+            b = modes_B[i_time, i_mode]
+            current[0] += z.real * z.real + z.imag * z.imag
+            current[1] += 2 * (z.real * z_prime.real + z.imag * z_prime.imag)
+            # ∂z/∂δϕ = i m (z + B), so Re[z̄ ∂z/∂δϕ] = -m Im[z̄ B]
+            current[2] -= 2 * m[i_mode] * (z.real * b.imag - z.imag * b.real)
+        if i_time > 0:
+            δ = 0.5 * (t_reference[i_time] - t_reference[i_time - 1])
+            diff += δ * (current[0] + previous[0])
+            d_δt += δ * (current[1] + previous[1])
+            d_δϕ += δ * (current[2] + previous[2])
+        previous[:] = current
+    return diff, d_δt, d_δϕ
 
 
 def _cost2d(δt_δϕ, args):
@@ -126,11 +287,103 @@ def _cost2d(δt_δϕ, args):
     δt, δϕ = δt_δϕ
 
     # Take the sqrt because least_squares squares the inputs...
-    diff = trapezoid(
-        np.sum(abs(modes_A(t_reference + δt) * np.exp(1j * m * δϕ) * δΨ_factor - modes_B) ** 2, axis=1),
+    diff = _cost2d_integral(modes_A(t_reference + δt), np.exp(1j * m * δϕ) * δΨ_factor, modes_B, t_reference)
+    return np.sqrt(diff / normalization)
+
+
+def _jacobian2d(δt_δϕ, args):
+    modes_A, modes_A_prime, modes_B, t_reference, m, δΨ_factor, normalization = args
+    δt, δϕ = δt_δϕ
+
+    diff, d_δt, d_δϕ = _cost2d_integral_gradient(
+        modes_A(t_reference + δt),
+        modes_A_prime(t_reference + δt),
+        np.exp(1j * m * δϕ) * δΨ_factor,
+        m,
+        modes_B,
         t_reference,
     )
-    return np.sqrt(diff / normalization)
+    # d(sqrt(I/N)) = dI / (2 N sqrt(I/N))
+    cost = np.sqrt(diff / normalization)
+    if cost == 0.0:
+        return np.zeros((1, 2))
+    return np.array([[d_δt, d_δϕ]]) / (2 * normalization * cost)
+
+
+def _cost2d_brute_force(
+    t_A, data_A, modes_B, t_reference, m, δt_brute_force, δϕ_brute_force, normalization, nprocs=None
+):
+    """Evaluate the cost of `_cost2d` on the full grid of (δΨ_factor, δt, δϕ) values
+
+    Rather than evaluating `_cost2d` separately at each point, we expand the
+    squared difference as
+
+        |A e^{imδϕ} δΨ - B|² = |A|² + |B|² - 2 δΨ Re[A B̄ e^{imδϕ}]
+
+    so that `A` only needs to be interpolated once for each δt (shared by both
+    values of δΨ_factor), and the sum over modes of the cross term becomes a
+    single matrix product for all values of δϕ.  The δt values are processed
+    in chunks to keep the memory footprint bounded.
+
+    Because this is only used to find a starting point for the optimization,
+    `A` is linearly interpolated from the input `data_A` sampled at `t_A`,
+    which is much cheaper than evaluating the spline.  The search for the
+    interval containing each time is done once and shared by all modes.  For
+    the same reason, the arithmetic is done in single precision, which halves
+    the memory traffic.  To keep physical-unit data (e.g., strain of order
+    1e-21) from underflowing, both waveforms are first divided by the rms
+    amplitude of `B` over the reference times, in double precision.
+
+    The chunks are independent, and numpy releases the GIL for the heavy
+    lifting, so they are distributed over `nprocs` threads (all available cpus
+    by default).  If `nprocs` is -1, the chunks are processed serially.
+
+    Returns an array of shape (2, len(δt_brute_force), len(δϕ_brute_force)),
+    where the first axis corresponds to δΨ_factor in [-1, +1].
+
+    """
+    scale = np.sqrt(normalization / (t_reference[-1] - t_reference[0]))
+    if not np.isfinite(scale) or scale == 0.0:
+        scale = 1.0
+    normalization = normalization / scale**2
+    data_A = (data_A / scale).astype(np.complex64)
+    modes_B = modes_B / scale
+    phases = np.exp(1j * np.outer(m, δϕ_brute_force)).astype(np.complex64)
+    modes_B_conj = np.conj(modes_B).astype(np.complex64)
+    norm2_B = np.sum(abs(modes_B) ** 2, axis=1).astype(np.float32)
+
+    weights = _trapezoid_weights(t_reference)
+    diff = np.empty((2, δt_brute_force.size, δϕ_brute_force.size))
+
+    def evaluate_chunk(i):
+        δt_chunk = δt_brute_force[i : i + chunk_size]
+        t_chunk = t_reference[np.newaxis, :] + δt_chunk[:, np.newaxis]
+        i_A = np.clip(np.searchsorted(t_A, t_chunk, side="right"), 1, t_A.size - 1)
+        weight = np.clip((t_chunk - t_A[i_A - 1]) / (t_A[i_A] - t_A[i_A - 1]), 0.0, 1.0).astype(np.float32)
+        weight = weight[..., np.newaxis]
+        A = data_A[i_A - 1]
+        A += weight * (data_A[i_A] - A)
+        norm2 = (np.sum(abs(A) ** 2, axis=2) + norm2_B)[..., np.newaxis]
+        cross = 2 * np.real((A * modes_B_conj) @ phases)
+        for j, δΨ_factor in enumerate([-1, +1]):
+            diff[j, i : i + chunk_size] = weights @ (norm2 - δΨ_factor * cross)
+
+    if nprocs is None:
+        nprocs = os.cpu_count() or 1
+    n_workers = max(1, nprocs)
+
+    # Split the memory budget among the workers, but make sure each one gets some work
+    chunk_size = max(1, min(2**22 // (n_workers * modes_B.size), (δt_brute_force.size + n_workers - 1) // n_workers))
+    chunk_starts = range(0, δt_brute_force.size, chunk_size)
+    if n_workers == 1:
+        for i in chunk_starts:
+            evaluate_chunk(i)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(evaluate_chunk, chunk_starts))
+
+    # Roundoff can make the expanded form very slightly negative near a perfect match
+    return np.sqrt(np.maximum(diff, 0.0) / normalization)
 
 
 def align2d(wa, wb, t1, t2, n_brute_force_δt=None, n_brute_force_δϕ=5, include_modes=None, nprocs=None):
@@ -181,8 +434,9 @@ def align2d(wa, wb, t1, t2, n_brute_force_δt=None, n_brute_force_δϕ=5, includ
     include_modes: list, optional
         A list containing the (ell, m) modes to be included in the L² norm.
     nprocs: int, optional
-        Number of cpus to use. Default is maximum number.
-        If -1 is provided, then no multiprocessing is performed.
+        Number of threads to use for the brute-force search.  Default is the
+        number of available cpus.  If -1 is provided, then no multithreading
+        is performed.
 
     Returns
     -------
@@ -210,8 +464,6 @@ def align2d(wa, wb, t1, t2, n_brute_force_δt=None, n_brute_force_δϕ=5, includ
     from .. import WaveformModes
 
     wa_orig = wa
-    wa = wa.copy()
-    wb = wb.copy()
 
     # Check that (t1, t2) makes sense and is actually contained in both waveforms
     if t2 <= t1:
@@ -228,77 +480,85 @@ def align2d(wa, wb, t1, t2, n_brute_force_δt=None, n_brute_force_δϕ=5, includ
     # We'll start by brute forcing, sampling time offsets evenly at as many
     # points as there are time steps in (t1,t2) in the input waveforms
     if n_brute_force_δt is None:
-        n_brute_force_δt = max(sum((wa.t >= t1) & (wa.t <= t2)), sum((wb.t >= t1) & (wb.t <= t2)))
+        n_brute_force_δt = max(
+            np.searchsorted(wa.t, t2, side="right") - np.searchsorted(wa.t, t1, side="left"),
+            np.searchsorted(wb.t, t2, side="right") - np.searchsorted(wb.t, t1, side="left"),
+        )
     δt_brute_force = np.linspace(δt_lower, δt_upper, num=n_brute_force_δt)
 
     if n_brute_force_δϕ is None:
         n_brute_force_δϕ = 2 * wa.ell_max + 1
     δϕ_brute_force = np.linspace(0, 2 * np.pi, n_brute_force_δϕ, endpoint=False)
 
-    δt_δϕ_brute_force = np.array(np.meshgrid(δt_brute_force, δϕ_brute_force)).T.reshape(-1, 2)
-
-    t_reference = wa.t[np.argmin(abs(wa.t - t1)) : np.argmin(abs(wa.t - t2)) + 1]
+    t_reference = wa.t[wa.index_closest_to(t1) : wa.index_closest_to(t2) + 1]
 
     # Remove certain modes, if requested
     ell_max = min(wa.ell_max, wb.ell_max)
+    modes_slice_a = _modes_slice(wa.ell_min, ell_max)
+    modes_slice_b = _modes_slice(wb.ell_min, ell_max)
     if include_modes != None:
-        for L in range(2, ell_max + 1):
-            for M in range(-L, L + 1):
-                if not (L, M) in include_modes:
-                    wa.data[:, wa.index(L, M)] *= 0
-                    wb.data[:, wb.index(L, M)] *= 0
-
-    # Define the cost function
-    modes_A = CubicSpline(wa.t, wa[:, wa.index(2, -2) : wa.index(ell_max + 1, -(ell_max + 1))].data)
-    modes_B = CubicSpline(wb.t, wb[:, wb.index(2, -2) : wb.index(ell_max + 1, -(ell_max + 1))].data)(t_reference)
-
-    normalization = trapezoid(
-        CubicSpline(wb.t, wb[:, wb.index(2, -2) : wb.index(ell_max + 1, -(ell_max + 1))].norm ** 2)(t_reference),
-        t_reference,
+        # Copy first, so that the input waveforms are not modified
+        wa = wa.copy()
+        wb = wb.copy()
+        excluded_modes = [
+            (L, M) for L in range(2, ell_max + 1) for M in range(-L, L + 1) if (L, M) not in include_modes
+        ]
+        wa.data[:, np.array([wa.index(L, M) for L, M in excluded_modes], dtype=int)] = 0
+        wb.data[:, np.array([wb.index(L, M) for L, M in excluded_modes], dtype=int)] = 0
+
+    # Define the cost function, using contiguous copies of the relevant modes
+    data_A = np.ascontiguousarray(wa.data[:, modes_slice_a])
+    data_B = np.ascontiguousarray(wb.data[:, modes_slice_b])
+    modes_A = CubicSpline(wa.t, data_A)
+    modes_A_prime = modes_A.derivative()
+    modes_B = CubicSpline(wb.t, data_B)(t_reference)
+
+    # modes_B is already evaluated at t_reference, so we can integrate ‖wb‖² directly
+    normalization = trapezoid(np.sum(abs(modes_B) ** 2, axis=1), t_reference)
+
+    m = _m_values(ell_max)
+
+    # Optimize by brute force over the entire grid at once
+    cost_brute_force = _cost2d_brute_force(
+        wa.t, data_A, modes_B, t_reference, m, δt_brute_force, δϕ_brute_force, normalization, nprocs
     )
 
-    m = np.array([M for L in range(2, ell_max + 1) for M in range(-L, L + 1)])
-
     optimums = []
-    wa_primes = []
-    for δΨ_factor in [-1, +1]:
-        # Optimize by brute force with multiprocessing
+    for δΨ_factor, cost_brute_force_δΨ in zip([-1, +1], cost_brute_force):
         cost_wrapper = partial(_cost2d, args=[modes_A, modes_B, t_reference, m, δΨ_factor, normalization])
+        jacobian_wrapper = partial(
+            _jacobian2d, args=[modes_A, modes_A_prime, modes_B, t_reference, m, δΨ_factor, normalization]
+        )
 
-        if nprocs != -1:
-            if nprocs is None:
-                nprocs = mp.cpu_count()
-            pool = mp.Pool(processes=nprocs)
-            cost_brute_force = pool.map(cost_wrapper, δt_δϕ_brute_force)
-            pool.close()
-            pool.join()
-        else:
-            cost_brute_force = [cost_wrapper(δt_δϕ_brute_force_item) for δt_δϕ_brute_force_item in δt_δϕ_brute_force]
-
-        δt_δϕ = δt_δϕ_brute_force[np.argmin(cost_brute_force)]
+        i_δt, i_δϕ = np.unravel_index(np.argmin(cost_brute_force_δΨ), cost_brute_force_δΨ.shape)
+        δt_δϕ = np.array([δt_brute_force[i_δt], δϕ_brute_force[i_δϕ]])
 
         # Optimize explicitly
-        optimum = least_squares(cost_wrapper, δt_δϕ, bounds=[(δt_lower, 0), (δt_upper, 2 * np.pi)], max_nfev=50000)
-        optimums.append(optimum)
-        δt, δϕ = optimum.x
-
-        wa_prime = WaveformModes(
-            input_array=(
-                wa_orig[:, wa_orig.index(2, -2) : wa_orig.index(ell_max + 1, -(ell_max + 1))].data
-                * np.exp(1j * m * δϕ)
-                * δΨ_factor
-            ),
-            time=wa_orig.t - δt,
-            time_axis=0,
-            modes_axis=1,
-            ell_min=2,
-            ell_max=ell_max,
+        optimum = least_squares(
+            cost_wrapper,
+            δt_δϕ,
+            jac=jacobian_wrapper,
+            bounds=[(δt_lower, 0), (δt_upper, 2 * np.pi)],
+            max_nfev=50000,
         )
-        wa_primes.append(wa_prime)
+        optimums.append(optimum)
 
     idx = np.argmin(abs(np.array([optimum.cost for optimum in optimums])))
+    δΨ_factor = [-1, +1][idx]
+    δt, δϕ = optimums[idx].x
+
+    # Only construct the transformed waveform for the best δΨ_factor
+    wa_prime = WaveformModes(
+        # Combine the per-mode factors before touching the full data array
+        input_array=wa_orig.data[:, modes_slice_a] * (np.exp(1j * m * δϕ) * δΨ_factor),
+        time=wa_orig.t - δt,
+        time_axis=0,
+        modes_axis=1,
+        ell_min=2,
+        ell_max=ell_max,
+    )
 
-    return optimums[idx].cost, wa_primes[idx], optimums[idx]
+    return optimums[idx].cost, wa_prime, optimums[idx]
 
 
 def _cost4d(δt_δso3, args):
@@ -416,8 +676,6 @@ def align4d(
     from .. import WaveformModes
 
     wa_orig = wa
-    wa = wa.copy()
-    wb = wb.copy()
 
     # Check that (t1, t2) makes sense and is actually contained in both waveforms
     if t2 <= t1:
@@ -437,7 +695,7 @@ def align4d(
     # Negative sign because align1d aligns wb to wa
     δt_IG = -align1d(wa, wb, t1, t2)
 
-    t_reference = wb.t[np.argmin(abs(wb.t - t1)) : np.argmin(abs(wb.t - t2)) + 1]
+    t_reference = wb.t[wb.index_closest_to(t1) : wb.index_closest_to(t2) + 1]
     wa_interp = wa.interpolate(t_reference + δt_IG)
     wb_interp = wb.interpolate(t_reference)
     
@@ -453,21 +711,25 @@ def align4d(
         δt_δso3_brute_force.append([δt_IG, *np.log(R_IG * np.exp(quaternionic.array([0, 0, 0, angle / 2]))).vector])
 
     # Remove certain modes, if requested
+    modes_slice_a = _modes_slice(wa.ell_min, ell_max)
+    modes_slice_b = _modes_slice(wb.ell_min, ell_max)
     if include_modes != None:
-        for L in range(2, ell_max + 1):
-            for M in range(-L, L + 1):
-                if not (L, M) in include_modes:
-                    wa.data[:, wa.index(L, M)] *= 0
-                    wb.data[:, wb.index(L, M)] *= 0
-
-    # Define the cost function
-    modes_A = CubicSpline(wa.t, wa[:, wa.index(2, -2) : wa.index(ell_max + 1, -(ell_max + 1))].data)
-    modes_B = CubicSpline(wb.t, wb[:, wb.index(2, -2) : wb.index(ell_max + 1, -(ell_max + 1))].data)(t_reference)
-
-    normalization = trapezoid(
-        CubicSpline(wb.t, wb[:, wb.index(2, -2) : wb.index(ell_max + 1, -(ell_max + 1))].norm ** 2)(t_reference),
-        t_reference,
-    )
+        # Copy first, so that the input waveforms are not modified
+        wa = wa.copy()
+        wb = wb.copy()
+        excluded_modes = [
+            (L, M) for L in range(2, ell_max + 1) for M in range(-L, L + 1) if (L, M) not in include_modes
+        ]
+        wa.data[:, np.array([wa.index(L, M) for L, M in excluded_modes], dtype=int)] = 0
+        wb.data[:, np.array([wb.index(L, M) for L, M in excluded_modes], dtype=int)] = 0
+
+    # Define the cost function, using contiguous copies of the relevant modes
+    data_B = np.ascontiguousarray(wb.data[:, modes_slice_b])
+    modes_A = CubicSpline(wa.t, np.ascontiguousarray(wa.data[:, modes_slice_a]))
+    modes_B = CubicSpline(wb.t, data_B)(t_reference)
+
+    # modes_B is already evaluated at t_reference, so we can integrate ‖wb‖² directly
+    normalization = trapezoid(np.sum(abs(modes_B) ** 2, axis=1), t_reference)
 
     # Optimize by brute force with multiprocessing
     cost_wrapper = partial(_cost4d, args=[modes_A, modes_B, t_reference, normalization])
@@ -476,11 +738,13 @@ def align4d(
         if nprocs is None:
             nprocs = mp.cpu_count()
         pool = mp.Pool(processes=nprocs)
-        cost_brute_force = pool.map(cost_wrapper, δt_δso3_brute_force)
+        cost_brute_force = np.asarray(pool.map(cost_wrapper, δt_δso3_brute_force), dtype=float)
         pool.close()
         pool.join()
     else:
-        cost_brute_force = [cost_wrapper(δt_δso3_brute_force_item) for δt_δso3_brute_force_item in δt_δso3_brute_force]
+        cost_brute_force = np.empty(len(δt_δso3_brute_force))
+        for i, δt_δso3_brute_force_item in enumerate(δt_δso3_brute_force):
+            cost_brute_force[i] = cost_wrapper(δt_δso3_brute_force_item)
 
     δt_δso3 = δt_δso3_brute_force[np.argmin(cost_brute_force)]
     
@@ -495,7 +759,7 @@ def align4d(
     δso3 = np.exp(quaternionic.array([0] + list(optimum.x[1:])))
     
     wa_prime = WaveformModes(
-        input_array=(wa_orig[:, wa_orig.index(2, -2) : wa_orig.index(ell_max + 1, -(ell_max + 1))].data),
+        input_array=(wa_orig.data[:, modes_slice_a]),
         time=wa_orig.t - δt,
         time_axis=0,
         modes_axis=1,
@@ -2,6 +2,14 @@
 
 """
 
+import json
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None
+
 
 # NOTE: This string is placed into the top of the catalog JSON file as a JSON string.  JSON strings
 # are enclosed in double quotes, so it would quickly get ugly if we used double quotes within this
@@ -152,6 +160,106 @@ catalog_file_description = """
 """
 
 
+def _json_loads(s):
+    """Parse JSON from str or bytes, using orjson if it is available
+
+    Note that orjson rejects the non-standard `NaN` and `Infinity` literals that
+    the standard-library encoder may have written, so we fall back to `json` for
+    such documents.
+
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
+
+
+def _copy_json_tree(obj):
+    """Deep copy of JSON-like data
+
+    This specializes `copy.deepcopy` for trees of plain dicts and lists whose leaves
+    are immutable JSON scalars, which is what the catalog consists of; this skips
+    deepcopy's dispatch and memo bookkeeping, and is a few times faster.  Anything
+    else is handed to `copy.deepcopy`.
+
+    """
+    t = type(obj)
+    if t is dict:
+        return {key: _copy_json_tree(value) for key, value in obj.items()}
+    if t is list:
+        return [_copy_json_tree(value) for value in obj]
+    if t in (str, int, float, bool) or obj is None:
+        return obj
+    import copy
+    return copy.deepcopy(obj)
+
+
+def _iterencode_by_key(obj, depth, indent=None, separators=None, level=0):
+    """Encode `obj` to JSON in chunks, serializing nested values one at a time
+
+    The output is identical to `json.dump(obj, f, indent=indent,
+    separators=separators)`.  Dicts nested up to `depth` levels deep are written key
+    by key, and each value below that is encoded with a single call to
+    `json.dumps`.  Unlike `json.dump`, which always uses the pure-Python encoder,
+    this lets compact output (`indent=None`) use the C encoder, which is roughly
+    twice as fast; indented output gains only a little from making fewer, larger
+    writes.  Note that the text of one such value is held in memory at a time.
+
+    """
+    item_separator, key_separator = separators or ((', ', ': ') if indent is None else (',', ': '))
+    newline = '' if indent is None else '\n' + ' ' * (indent * (level + 1))
+    if depth > 0 and type(obj) is dict and obj:
+        yield '{'
+        for i, (key, value) in enumerate(obj.items()):
+            yield (item_separator if i else '') + newline + json.dumps(key) + key_separator
+            yield from _iterencode_by_key(value, depth - 1, indent, separators, level + 1)
+        yield '' if indent is None else '\n' + ' ' * (indent * level)
+        yield '}'
+    else:
+        encoded = json.dumps(obj, indent=indent, separators=separators)
+        if indent is not None and level > 0:
+            # JSON strings cannot contain literal newlines, so this only shifts the indentation
+            encoded = encoded.replace('\n', '\n' + ' ' * (indent * level))
+        yield encoded
+
+
+@contextmanager
+def _atomic_write(path, mode='w'):
+    """Write to a temporary file that replaces `path` only once it is complete
+
+    This ensures that readers (including a crashed or interrupted `update`) never
+    see a partially written file.  Symlinks are resolved first, so that the file
+    they point to is the one replaced, and the permissions of any existing file are
+    preserved.  If the temporary file cannot be created because the directory is
+    not writable, this falls back to writing `path` in place.
+
+    """
+    import os
+    import shutil
+    real_path = os.path.realpath(path)
+    temp_path = real_path + '.tmp'
+    try:
+        f = open(temp_path, mode)
+    except PermissionError:
+        with open(real_path, mode) as f:
+            yield f
+        return
+    try:
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(real_path):
+            shutil.copymode(real_path, temp_path)
+        os.replace(temp_path, real_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 def _include_file_data(login, record):
     """Ensure that 'files' field is present in the input record"""
     if 'files' not in record:
@@ -163,40 +271,77 @@ def _include_file_data(login, record):
             return record  # We have failed, but we're not too upset
         r = login.session.get(url)
         if r.status_code == 200:  # Otherwise, we just couldn't add this record; oh well.
-            r_json = r.json()
+            r_json = _json_loads(r.content)
             record['files'] = r_json
     return record
 
 
+def _metadata_file_info(record):
+    """Return the file description of the highest-Lev metadata.json in this record"""
+    from operator import itemgetter
+    return max((f for f in record.get('files', []) if '/metadata.json' in f['filename']),
+               default={}, key=itemgetter('filename'))
+
+
 def _create_simulations_skeleton(record_list):
     """Create a dictionary of simulations with information for downloading SXS metadata"""
     from .. import sxs_id
     return {
-        sxs_id(r.get('title', '')): {
+        sxsid: {
             'url': r['links']['conceptdoi'],
-            'metadata_file_info': max([f for f in r.get('files', []) if '/metadata.json' in f['filename']],
-                                      default={}, key=lambda f: f['filename'])
+            'metadata_file_info': _metadata_file_info(r)
         }
-        for r in record_list if sxs_id(r.get('title', ''))
+        for r in record_list for sxsid in [sxs_id(r.get('title', ''))] if sxsid
     }
 
 
-def _download_sxs_metadata(login, simulations):
-    """Download metadata.json from Zenodo for each simulation, if needed"""
+def _download_sxs_metadata(login, simulations, max_workers=8):
+    """Download metadata.json from Zenodo for each simulation, if needed
+
+    The downloads are independent and dominated by network latency, so they are
+    issued from a pool of `max_workers` threads; the results are merged into
+    `simulations` serially.  Note that the default connection pool of a requests
+    session holds 10 connections, so more workers than that will not help.
+
+    """
+    import sys
     import traceback
+    from concurrent.futures import ThreadPoolExecutor
     from tqdm.auto import tqdm
-    for sxs_id in tqdm(simulations, dynamic_ncols=True):
-        download_url = simulations[sxs_id].get('metadata_file_info', {}).get('links', {}).get('download', '')
-        if not download_url:
-            continue
+
+    def fetch(download_url):
         try:
-            metadata = login.session.get(download_url).json()
-            simulations[sxs_id].pop('metadata_file_info', {})
-            simulations[sxs_id].update(metadata)
+            r = login.session.get(download_url)
+            if r.status_code != 200:  # Leave 'metadata_file_info' in place, so that this is retried next time
+                return None
+            return _json_loads(r.content)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    pending = [
+        (simulation, download_url)
+        for simulation in simulations.values()
+        for download_url in [simulation.get('metadata_file_info', {}).get('links', {}).get('download', '')]
+        if download_url
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, download_url) for _, download_url in pending]
+        try:
+            for (simulation, _), future in zip(pending, tqdm(futures, dynamic_ncols=True)):
+                metadata = future.result()
+                if not isinstance(metadata, dict):
+                    continue
+                try:
+                    simulation.pop('metadata_file_info', {})
+                    # Each file was parsed separately, so share one copy of the keys among all simulations
+                    simulation.update((sys.intern(key), value) for key, value in metadata.items())
+                except Exception:
+                    traceback.print_exc()
         except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
             raise
-        except:
-            traceback.print_exc()
 
 
 def create(login=None):
@@ -242,7 +387,7 @@ def create(login=None):
     return catalog
 
 
-def split_catalog(catalog):
+def split_catalog(catalog, deep_copy=True):
     """Split catalog four ways: private/public, and complete/simulations
 
     This function splits the catalog into four separate parts:
@@ -260,27 +405,44 @@ def split_catalog(catalog):
     public data as a fallback if the user's web browser does not send credentials
     along with the request for the data.
 
+    Parameters
+    ----------
+    catalog : dict
+        The catalog in the standard format output by functions in this submodule.
+    deep_copy : bool, optional [defaults to True]
+        If True, the private catalog and both simulations dicts are independent
+        copies of the input, so that they may be modified freely.  If False, all
+        four outputs share data with the input catalog, which avoids copying the
+        entire catalog when the results are only to be read (e.g., written to
+        file).
+
     """
-    import copy
-    private_catalog = copy.deepcopy(catalog)
-    private_simulations = copy.deepcopy(catalog['simulations'])
+    if deep_copy:
+        private_catalog = _copy_json_tree(catalog)
+        private_simulations = _copy_json_tree(catalog['simulations'])
+    else:
+        private_catalog = catalog
+        private_simulations = catalog['simulations']
     public_catalog = {
         'catalog_file_description': catalog['catalog_file_description'],
         'modified': catalog['modified'],
         'records': {
-            recid: catalog['records'][recid]
-            for recid in catalog['records']
-            if catalog['records'][recid].get('metadata', {}).get('access_right', '') == 'open'
+            recid: record
+            for recid, record in catalog['records'].items()
+            if record.get('metadata', {}).get('access_right', '') == 'open'
         }
     }
-    public_conceptdoi_links = [public_catalog['records'][recid].get('links', {}).get('conceptdoi', None)
-                               for recid in public_catalog['records']]
+    public_conceptdoi_links = {record.get('links', {}).get('conceptdoi', None)
+                               for record in public_catalog['records'].values()}
     public_catalog['simulations'] = {
-        sxs_id: catalog['simulations'][sxs_id]
-        for sxs_id in catalog['simulations']
-        if catalog['simulations'][sxs_id].get('url', '') in public_conceptdoi_links
+        sxs_id: simulation
+        for sxs_id, simulation in catalog['simulations'].items()
+        if simulation.get('url', '') in public_conceptdoi_links
     }
-    public_simulations = copy.deepcopy(public_catalog['simulations'])
+    if deep_copy:
+        public_simulations = _copy_json_tree(public_catalog['simulations'])
+    else:
+        public_simulations = public_catalog['simulations']
     return private_catalog, private_simulations, public_catalog, public_simulations
 
 
@@ -317,7 +479,6 @@ def write_split_catalogs(catalog, public_dir='~/.sxs/catalog/', private_dir='~/.
     import os
     from os.path import expanduser, normpath, join
     from datetime import datetime
-    import json
 
     def mkdirs(path):
         # In python >3.2, this could just be os.makedirs(path, exist_ok=True)
@@ -342,20 +503,21 @@ def write_split_catalogs(catalog, public_dir='~/.sxs/catalog/', private_dir='~/.
         if not private_prefix:
             private_prefix = 'private_'
     
-    private_catalog, private_simulations, public_catalog, public_simulations = split_catalog(catalog)
+    private_catalog, private_simulations, public_catalog, public_simulations = split_catalog(catalog, deep_copy=False)
 
     public_catalog_path = join(public_dir, public_prefix+'catalog.json')
     public_simulations_path = join(public_dir, public_prefix+'simulations.json')
     private_catalog_path = join(private_dir, private_prefix+'catalog.json')
     private_simulations_path = join(private_dir, private_prefix+'simulations.json')
-    with open(public_catalog_path, 'w') as f:
-        json.dump(public_catalog, f, indent=2, separators=(',', ': '), ensure_ascii=True)
-    with open(public_simulations_path, 'w') as f:
-        json.dump(public_simulations, f, indent=None, separators=(',', ':'), ensure_ascii=True)
-    with open(private_catalog_path, 'w') as f:
-        json.dump(private_catalog, f, indent=2, separators=(',', ': '), ensure_ascii=True)
-    with open(private_simulations_path, 'w') as f:
-        json.dump(private_simulations, f, indent=None, separators=(',', ':'), ensure_ascii=True)
+    # Encode one record or simulation at a time, so that the compact files can use json's C encoder
+    with _atomic_write(public_catalog_path) as f:
+        f.writelines(_iterencode_by_key(public_catalog, 2, indent=2, separators=(',', ': ')))
+    with _atomic_write(public_simulations_path) as f:
+        f.writelines(_iterencode_by_key(public_simulations, 1, indent=None, separators=(',', ':')))
+    with _atomic_write(private_catalog_path) as f:
+        f.writelines(_iterencode_by_key(private_catalog, 2, indent=2, separators=(',', ': ')))
+    with _atomic_write(private_simulations_path) as f:
+        f.writelines(_iterencode_by_key(private_simulations, 1, indent=None, separators=(',', ':')))
 
     public_modified = max(public_catalog['records'][doi].get('modified', '') for doi in public_catalog['records'])
     private_modified = max(private_catalog['records'][doi].get('modified', '') for doi in private_catalog['records'])
@@ -398,7 +560,6 @@ def update(login=None, path='~/.sxs/catalog/private_catalog.json',
 
     """
     from os.path import expanduser, join, dirname, exists
-    import json
     from . import Login
     from .. import sxs_id
 
@@ -412,8 +573,8 @@ def update(login=None, path='~/.sxs/catalog/private_catalog.json',
         raise ValueError("Could not find catalog file in '{0}'.".format(dirname(path)))
 
     # Read the catalog file
-    with open(path, 'r') as f:
-        catalog = json.load(f)
+    with open(path, 'rb') as f:
+        catalog = _json_loads(f.read())
     records = catalog['records']
     simulations = catalog['simulations']
 
@@ -428,27 +589,48 @@ def update(login=None, path='~/.sxs/catalog/private_catalog.json',
 
     # Loop through the zenodo records, ensuring that they are all present and current in the old records
     catalog_changed = False
-    for r in zenodo_records:
-        if r not in records or zenodo_records[r].get('modified', 0) != records[r].get('modified', 1):
-            records[r] = _include_file_data(l, zenodo_records[r])
-            new_simulation = _create_simulations_skeleton([records[r], ])
-            simulations.update(new_simulation)
+    for doi_url, record in zenodo_records.items():
+        old_record = records.get(doi_url)
+        if old_record is None or record.get('modified', 0) != old_record.get('modified', 1):
+            record = records[doi_url] = _include_file_data(l, record)
+            for sxsid, new_simulation in _create_simulations_skeleton([record, ]).items():
+                # If only the Zenodo metadata of this record changed, the checksum of its metadata.json will
+                # match the one we already downloaded, so we can keep that instead of fetching it again.
+                old_simulation = simulations.get(sxsid, {})
+                old_checksum = _metadata_file_info(old_record).get('checksum') if old_record else None
+                if (
+                    old_checksum and 'metadata_file_info' not in old_simulation and len(old_simulation) > 1
+                    and old_checksum == new_simulation['metadata_file_info'].get('checksum')
+                ):
+                    old_simulation['url'] = new_simulation['url']
+                else:
+                    simulations[sxsid] = new_simulation
             catalog_changed = True
 
     if catalog_changed:
         # Loop through the dictionary we just created, and download the metadata.json for each one
         _download_sxs_metadata(l, simulations)
 
-        # Update the modification time
-        catalog['modified'] = max(catalog['modified'], max(records[doi].get('modified', '') for doi in records))
+        # Find the modification time and the SXS-to-zenodo map in a single pass over the records; all versions
+        # of a simulation share a title, so parse each title just once
+        modified = catalog['modified']
+        title_to_sxs_id = {}
+        sxs_id_to_conceptrecid = {}
+        for doi, record in records.items():
+            modified = max(modified, record.get('modified', ''))
+            title = record['title']
+            if title not in title_to_sxs_id:
+                title_to_sxs_id[title] = sxs_id(title)
+            sxsid = title_to_sxs_id[title]
+            if sxsid:
+                sxs_id_to_conceptrecid[sxsid] = doi.replace('https://doi.org/10.5281/zenodo.', '')
+        catalog['modified'] = modified
 
         # Write the various catalog files
         write_split_catalogs(catalog, public_dir=public_out_dir, private_dir=private_out_dir,
                              public_prefix='public_', private_prefix='private_')
 
         # Update the SXS-to-zenodo map
-        sxs_id_to_conceptrecid = {sxsid: doi.replace('https://doi.org/10.5281/zenodo.', '')
-                                  for doi in records for sxsid in [sxs_id(records[doi]['title'])] if sxsid}
         nginx_map(sxs_id_to_conceptrecid, nginx_map_file_path)
 
     return
@@ -462,11 +644,8 @@ def sxs_metadata_file_description(representation):
     """Find metadata file from highest Lev for this simulation"""
     from os.path import basename
     files = representation.get('files', [])
-    metadata_files = [f for f in files if basename(f.get('filename', '')) == 'metadata.json']
-    metadata_files = sorted(metadata_files, key=lambda f: f['filename'])
-    if not metadata_files:
-        return None
-    return metadata_files[-1]
+    return max((f for f in files if basename(f.get('filename', '')) == 'metadata.json'),
+               default=None, key=lambda f: f['filename'])
 
 
 def fetch_metadata(url, login=None, *args, **kwargs):
@@ -477,7 +656,7 @@ def fetch_metadata(url, login=None, *args, **kwargs):
     if r.status_code != 200:
         return {}
     try:
-        return r.json()
+        return _json_loads(r.content)
     except Exception:
         return {}
 
@@ -505,7 +684,6 @@ def nginx_map(sxs_id_to_conceptrecid, map_file_path=None):
 
     """
     from os.path import expanduser
-    import math
 
     def touch(fname, times=None):
         from os import utime
@@ -527,15 +705,20 @@ def nginx_map(sxs_id_to_conceptrecid, map_file_path=None):
     else:
         map_file_path = expanduser(map_file_path)
     # Figure out how to construct the output
-    size = 64 * 2**math.ceil(math.log2(len(sxs_id_to_conceptrecid)+1))  # nginx needs this to know the hash size
+    size = 64 << len(sxs_id_to_conceptrecid).bit_length()  # nginx needs this to know the hash size
     # Construct the output
-    with open(map_file_path, 'w') as f:
-        f.write("map_hash_max_size {0};\n".format(size))
-        f.write("map $sxs_id $zenodo_identifier {\n")
-        f.write("    default ../communities/sxs;\n")  # A bit hackish, but it gets us where we want to go
-        for sxs_identifier in sorted(sxs_id_to_conceptrecid):
-            f.write("    {0} {1};\n".format(sxs_identifier, sxs_id_to_conceptrecid[sxs_identifier]))
-        f.write("}\n")
+    lines = [
+        f"map_hash_max_size {size};\n",
+        "map $sxs_id $zenodo_identifier {\n",
+        "    default ../communities/sxs;\n",  # A bit hackish, but it gets us where we want to go
+    ]
+    lines.extend(
+        f"    {sxs_identifier} {conceptrecid};\n"
+        for sxs_identifier, conceptrecid in sorted(sxs_id_to_conceptrecid.items())
+    )
+    lines.append("}\n")
+    with _atomic_write(map_file_path) as f:
+        f.write("".join(lines))
 
 
 def resolutions_for_simulation(sxs_id, sxs_catalog):
@@ -0,0 +1,70 @@
+import numpy as np
+import sxs
+import pytest
+
+
+def chirp_waveform(δt=0.0, δϕ=0.0, begin=0.0, end=900.0, n_times=2000, ell_max=4):
+    """Simple inspiral-like waveform, optionally offset in time and phase"""
+    t = np.linspace(begin, end, num=n_times)
+    τ = np.maximum(1000.0 - (t + δt), 1.0)
+    ϕ = -2 * (τ / 5) ** (5 / 8)
+    amplitude = (τ / 5) ** (-1 / 4)
+    lm = np.array([[ell, m] for ell in range(2, ell_max + 1) for m in range(-ell, ell + 1)])
+    data = np.empty((t.shape[0], lm.shape[0]), dtype=complex)
+    for i, (ell, m) in enumerate(lm):
+        data[:, i] = amplitude * (1 + 0.1 * m) / ell**2 * np.exp(1j * m * (ϕ + δϕ))
+    return sxs.WaveformModes(
+        data,
+        time=t,
+        modes_axis=1,
+        ell_min=2,
+        ell_max=ell_max,
+        frame_type="inertial",
+        data_type="h",
+        spin_weight=-2,
+    )
+
+
+def test_align1d():
+    wa = chirp_waveform()
+    wb = chirp_waveform(δt=3.7)
+    δt = sxs.waveforms.alignment.align1d(wa, wb, 200.0, 700.0)
+    assert np.isclose(δt, -3.7, atol=1e-6)
+    with pytest.raises(ValueError):
+        sxs.waveforms.alignment.align1d(wa, wb, 700.0, 200.0)
+
+
+def test_align1d_brute_force_window():
+    wa = chirp_waveform()
+    wb = chirp_waveform(δt=3.7)
+    δt = sxs.waveforms.alignment.align1d(wa, wb, 200.0, 700.0, brute_force_window=20.0)
+    assert np.isclose(δt, -3.7, atol=1e-6)
+    # The optimum is outside this window, so this should fall back to the full search
+    δt_fallback = sxs.waveforms.alignment.align1d(wa, wb, 200.0, 700.0, brute_force_window=1.0)
+    assert δt_fallback == sxs.waveforms.alignment.align1d(wa, wb, 200.0, 700.0)
+
+
+def test_align2d():
+    wa = chirp_waveform(n_times=1000, ell_max=3)
+    wb = chirp_waveform(δt=3.7, δϕ=0.4, n_times=1000, ell_max=3)
+    error, wa_prime, optimum = sxs.waveforms.alignment.align2d(wa, wb, 200.0, 700.0, nprocs=-1)
+    assert error < 1e-8
+    assert np.allclose(optimum.x, [3.7, 0.4], atol=1e-3)
+    assert np.allclose(wa_prime.t, wa.t - optimum.x[0])
+    wa_data, wb_data = wa.data.copy(), wb.data.copy()
+    error, wa_prime, optimum = sxs.waveforms.alignment.align2d(
+        wa, wb, 200.0, 700.0, include_modes=[(2, 2), (2, -2), (3, 3)], nprocs=-1
+    )
+    assert np.allclose(optimum.x, [3.7, 0.4], atol=1e-3)
+    assert np.array_equal(wa.data, wa_data) and np.array_equal(wb.data, wb_data)
+
+
+@pytest.mark.parametrize("scale", [1e-21, 1e-24])
+def test_align2d_physical_units(scale):
+    wa = chirp_waveform(n_times=1000, ell_max=3)
+    wb = chirp_waveform(δt=3.7, δϕ=0.4, n_times=1000, ell_max=3)
+    wa.ndarray[:] *= scale
+    wb.ndarray[:] *= scale
+    error, wa_prime, optimum = sxs.waveforms.alignment.align2d(wa, wb, 200.0, 700.0, nprocs=-1)
+    assert error < 1e-8
+    assert np.allclose(optimum.x, [3.7, 0.4], atol=1e-3)
@@ -0,0 +1,144 @@
+import json
+import math
+import pytest
+import sxs
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return FakeResponse(json.dumps({"downloaded_from": url}).encode())
+
+
+class FakeLogin:
+    """Stand-in for sxs.zenodo.Login that serves canned records without touching the network"""
+
+    base_url = "https://zenodo.org/"
+
+    def __init__(self, records):
+        self.records = records
+        self.session = FakeSession()
+
+    def search(self, **kwargs):
+        return self.records
+
+
+def record(number, modified, checksum):
+    return {
+        "title": f"Binary black-hole simulation SXS:BBH:{number:04d}",
+        "doi_url": f"https://doi.org/10.5281/zenodo.{number}",
+        "modified": modified,
+        "id": number,
+        "metadata": {"access_right": "open"},
+        "links": {"conceptdoi": f"https://doi.org/10.5281/zenodo.{number}0"},
+        "files": [
+            {
+                "filename": "Lev2/metadata.json",
+                "checksum": checksum,
+                "links": {"download": f"https://zenodo.org/api/files/{number}/{checksum}/Lev2/metadata.json"},
+            },
+        ],
+    }
+
+
+def test_update_skips_unchanged_metadata(tmp_path):
+    old_time, new_time = "2020-01-01T00:00:00.000000", "2021-01-01T00:00:00.000000"
+    old_records = [record(1, old_time, "md5:a"), record(2, old_time, "md5:b"), record(3, old_time, "md5:c")]
+    catalog = {
+        "catalog_file_description": [],
+        "modified": old_time,
+        "records": {r["doi_url"]: r for r in old_records},
+        "simulations": {
+            # Metadata for this simulation was downloaded previously
+            "SXS:BBH:0001": {"url": "old_url", "reference_mass_ratio": 1.0},
+            "SXS:BBH:0002": {"url": "old_url", "reference_mass_ratio": 2.0},
+            # The previous download of this simulation's metadata failed
+            "SXS:BBH:0003": {"url": "old_url", "metadata_file_info": old_records[2]["files"][0]},
+        },
+    }
+    with open(tmp_path / "private_catalog.json", "w") as f:
+        json.dump(catalog, f)
+
+    # Every record was modified, but only the metadata.json of record 2 changed
+    new_records = [record(1, new_time, "md5:a"), record(2, new_time, "md5:B"), record(3, new_time, "md5:c")]
+    login = FakeLogin(new_records)
+    sxs.zenodo.catalog.update(
+        login,
+        path=str(tmp_path),
+        public_out_dir=str(tmp_path),
+        private_out_dir=str(tmp_path),
+        nginx_map_file_path=str(tmp_path / "sxs_to_zenodo.map"),
+    )
+    with open(tmp_path / "private_simulations.json", "r") as f:
+        simulations = json.load(f)
+
+    # Unchanged checksum: no request, and only the url is refreshed
+    assert simulations["SXS:BBH:0001"] == {"url": new_records[0]["links"]["conceptdoi"], "reference_mass_ratio": 1.0}
+    # Changed checksum: the new metadata is downloaded
+    download_2 = new_records[1]["files"][0]["links"]["download"]
+    assert simulations["SXS:BBH:0002"] == {"url": new_records[1]["links"]["conceptdoi"], "downloaded_from": download_2}
+    # Failed previous download: retried
+    download_3 = new_records[2]["files"][0]["links"]["download"]
+    assert simulations["SXS:BBH:0003"] == {"url": new_records[2]["links"]["conceptdoi"], "downloaded_from": download_3}
+    assert sorted(login.session.requested) == sorted([download_2, download_3])
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 3])
+@pytest.mark.parametrize(
+    "indent, separators", [(None, (",", ":")), (None, None), (0, None), (2, (",", ": ")), (4, None)]
+)
+def test_iterencode_by_key(depth, indent, separators):
+    objects = [
+        {},
+        {"a": {}},
+        {"a": {"b": [1, {"c": "x\ny"}], "d": {}}, "e": math.nan, "f": "Müller"},
+        {"records": {str(i): {"x": [i, {"y": [i] * 3}], "z": {}} for i in range(5)}, "simulations": []},
+        [1, {"a": 2}],
+        3.5,
+    ]
+    for obj in objects:
+        encoded = "".join(sxs.zenodo.catalog._iterencode_by_key(obj, depth, indent=indent, separators=separators))
+        assert encoded == json.dumps(obj, indent=indent, separators=separators)
+
+
+def test_split_catalog_copies():
+    catalog = {
+        "catalog_file_description": ["description"],
+        "modified": "2021-01-01T00:00:00.000000",
+        "records": {
+            "doi1": {"metadata": {"access_right": "open"}, "links": {"conceptdoi": "c1"}, "files": [{"a": [1, 2.5]}]},
+            "doi2": {"metadata": {"access_right": "closed"}, "links": {"conceptdoi": "c2"}},
+        },
+        "simulations": {
+            "SXS:BBH:0001": {"url": "c1", "nested": [1, {"b": None, "c": [True]}], "not_json": {1, 2}},
+            "SXS:BBH:0002": {"url": "c2", "not_json": {3}},
+        },
+    }
+
+    def mutable_ids(obj):
+        """ids of all containers in this tree, including non-JSON leaves"""
+        if isinstance(obj, dict):
+            return {id(obj)}.union(*(mutable_ids(value) for value in obj.values()))
+        if isinstance(obj, list):
+            return {id(obj)}.union(*(mutable_ids(value) for value in obj))
+        if isinstance(obj, (str, int, float, bool)) or obj is None:
+            return set()
+        return {id(obj)}
+
+    original_ids = mutable_ids(catalog)
+    private_catalog, private_simulations, public_catalog, public_simulations = sxs.zenodo.catalog.split_catalog(catalog)
+    assert private_catalog == catalog
+    assert private_simulations == catalog["simulations"]
+    assert public_simulations == {"SXS:BBH:0001": catalog["simulations"]["SXS:BBH:0001"]}
+    for copied in [private_catalog, private_simulations, public_simulations]:
+        assert not mutable_ids(copied) & original_ids
+    assert not mutable_ids(private_catalog) & mutable_ids(private_simulations)